@@ -20,6 +20,10 @@ def create_app(config_name):
     db.init_app(app)
     jwt.init_app(app)
 
+    # Compress large responses for clients that accept it
+    from .compression import init_compression
+    init_compression(app)
+
     # Register Blueprints
     from .views import auth_bp, user_bp, org_bp, user_home_bp  # Ensure these imports are correct
     app.register_blueprint(auth_bp)
@@ -0,0 +1,138 @@
+import gzip
+import itertools
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+# Responses that never carry a body worth compressing
+NO_BODY_STATUSES = (204, 304)
+# Partial content: compressing would invalidate the byte ranges
+PARTIAL_STATUSES = (206,)
+# Valid ranges for the gzip level and brotli quality settings
+LEVEL_RANGES = {'COMPRESS_LEVEL': (1, 9), 'COMPRESS_BR_LEVEL': (0, 11)}
+
+
+def init_compression(app):
+    '''Register the after-request hook that compresses responses
+    using the encoding negotiated from the Accept-Encoding header.'''
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    # Fail at startup rather than turning every large response into a 500
+    for key, (low, high) in LEVEL_RANGES.items():
+        if not low <= app.config[key] <= high:
+            raise ValueError(f"{key} must be between {low} and {high}, got {app.config[key]}")
+
+    @app.after_request
+    def compress_response(response):
+        encoding = choose_encoding()
+        if encoding and should_compress(response, app.config):
+            compress(response, encoding, app.config)
+        elif response.mimetype in app.config['COMPRESS_MIMETYPES']:
+            response.vary.add('Accept-Encoding')
+        return response
+
+
+def choose_encoding():
+    '''Pick the encoding the client rates highest, with brotli (when
+    installed) winning ties. Returns None if neither is acceptable.'''
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def should_compress(response, config):
+    if response.status_code < 200 or response.status_code in NO_BODY_STATUSES:
+        return False
+    if response.status_code in PARTIAL_STATUSES or 'Content-Range' in response.headers:
+        return False
+    if response.headers.get('Accept-Ranges') == 'bytes':
+        return False
+    if response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return False
+    if 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return False
+    if response.is_streamed:
+        # Error bodies are small, so leave them alone
+        if response.status_code >= 400 or not config['COMPRESS_STREAMS']:
+            return False
+        return peek_stream(response, config['COMPRESS_MIN_SIZE'])
+    # Small bodies (including the usual error payloads) cost more CPU than they save
+    content_length = response.content_length
+    if content_length is None:
+        # Bodies built from a list of chunks have no Content-Length yet
+        content_length = len(response.get_data())
+    return content_length >= config['COMPRESS_MIN_SIZE']
+
+
+def peek_stream(response, min_size):
+    '''Read a streamed body until min_size bytes have been produced or it
+    ends, then put the buffered chunks back in front of the rest.
+    Returns True if the stream reached min_size. A stream that ends
+    below it is left as a plain list and sent uncompressed.'''
+    source = response.response
+    chunks = iter(source)
+    head, size = [], 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        head.append(chunk)
+        size += len(chunk)
+        if size >= min_size:
+            response.response = itertools.chain(head, chunks)
+            break
+    else:
+        response.response = head
+    # The body was replaced, so keep the source's close() (file handles,
+    # cursors, stream_with_context teardown) running when the response closes
+    if hasattr(source, 'close'):
+        response.call_on_close(source.close)
+    return size >= min_size
+
+
+def compress(response, encoding, config):
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, config)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(compress_bytes(response.get_data(), encoding, config))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The representation changed, so a strong ETag no longer applies
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_bytes(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+
+def compress_stream(chunks, encoding, config):
+    '''Compress a chunked body incrementally, flushing after every chunk
+    so clients still receive data as it is produced.'''
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESS_BR_LEVEL'])
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        # wbits=31 produces a gzip header and trailer
+        compressor = zlib.compressobj(config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
@@ -0,0 +1,77 @@
+'''Compression benchmark.
+Reports CPU time versus bytes saved for each gzip level (and brotli
+quality, when installed) on an organisation listing like the one
+returned by GET /api/organisations. Buffered rows compress the whole
+body at once; stream rows feed it to compress_stream in CHUNK_SIZE
+pieces, paying for a sync flush after every chunk.
+
+Usage: python benchmarks/compression_bench.py [org_count]
+'''
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.compression import brotli, compress_stream
+
+ROUNDS = 50
+CHUNK_SIZE = 1024
+
+
+def build_payload(org_count):
+    response = OrderedDict([
+        ("status", "success"),
+        ("message", "Organisations fetched successfully"),
+        ("data", OrderedDict([
+            ("organisations", [{"orgId": str(uuid.uuid4()), "name": f"Team {i}",
+                                "description": f"This is an organization for team {i} developers"}
+                               for i in range(org_count)])
+        ]))
+    ])
+    return json.dumps(response).encode('utf-8')
+
+
+def measure(name, compress, payload):
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(ROUNDS):
+        compressed = compress(payload)
+    cpu_ms = (time.process_time() - cpu_start) / ROUNDS * 1000
+    wall_ms = (time.perf_counter() - wall_start) / ROUNDS * 1000
+    ratio = len(compressed) / len(payload) * 100
+    print(f"{name:<16}{len(compressed):>10}{ratio:>9.1f}%{cpu_ms:>14.3f}{wall_ms:>14.3f}")
+
+
+def streamed(encoding, level):
+    config = {'COMPRESS_LEVEL': level, 'COMPRESS_BR_LEVEL': level}
+
+    def compress(payload):
+        chunks = (payload[i:i + CHUNK_SIZE] for i in range(0, len(payload), CHUNK_SIZE))
+        return b''.join(compress_stream(chunks, encoding, config))
+    return compress
+
+
+def main():
+    org_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    payload = build_payload(org_count)
+    print(f"Payload: {org_count} organisations, {len(payload)} bytes, {ROUNDS} rounds each, "
+          f"{CHUNK_SIZE}-byte stream chunks\n")
+    print(f"{'encoding':<16}{'bytes':>10}{'ratio':>10}{'cpu ms/call':>14}{'wall ms/call':>14}")
+    for level in range(1, 10):
+        measure(f"gzip-{level}", lambda data: gzip.compress(data, compresslevel=level, mtime=0), payload)
+        measure(f"gzip-{level}-stream", streamed('gzip', level), payload)
+    if brotli is None:
+        print("\nbrotli not installed, skipping brotli qualities")
+        return
+    for quality in range(0, 12):
+        measure(f"br-{quality}", lambda data: brotli.compress(data, quality=quality), payload)
+        measure(f"br-{quality}-stream", streamed('br', quality), payload)
+
+
+if __name__ == '__main__':
+    main()
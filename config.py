@@ -9,6 +9,14 @@ class Config:
 
     JWT_ACCESS_TOKEN_EXPIRES = datetime.timedelta(minutes=15)  # Set the token expiration time
 
+    # Response compression (gzip, or brotli when installed)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'on')
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))  # Bytes; smaller bodies are sent as-is
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip level 1-9
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', 4))  # brotli quality 0-11
+    COMPRESS_STREAMS = True  # Compress chunked (streamed) responses as they are produced
+    COMPRESS_MIMETYPES = ['application/json', 'text/html', 'text/plain']
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
@@ -1,14 +1,18 @@
 import unittest
 import sys
 import os
+import gzip
 # Add the project root directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from flask_jwt_extended import decode_token
 from app import create_app, db
-from app.models import User, Organization
-from flask import json
+from app.models import User, Organization, UserOrganization
+from flask import json, Response
+from app.compression import brotli
+from config import TestingConfig
 
 
 class UnitTestCase(unittest.TestCase):
@@ -172,5 +176,201 @@ class EndToEndTestCase(unittest.TestCase):
         self.assertIn('Email already exists', data['errors'][0]['message'])
 
 
+def compression_test_user():
+    return {
+        'firstName': 'michael',
+        'lastName': 'ekpenyong',
+        'email': 'mekpenyong2@gmail.com',
+        'password': 'securepassword',
+        'phone': '123-456-7890'
+    }
+
+
+class CompressionTestCase(unittest.TestCase):
+    '''Compression tests.
+    The tests cover gzip negotiation, the size threshold and streamed responses.'''
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def register_and_login(self):
+        user = compression_test_user()
+        self.client().post('/auth/register', data=json.dumps(user), content_type='application/json')
+        return self.client().post('/auth/login', data=json.dumps({
+            'email': user['email'],
+            'password': user['password']
+        }), content_type='application/json')
+
+    def login_with_many_organizations(self, count):
+        response = self.register_and_login()
+        data = json.loads(response.data)
+        user_id = data['data']['user']['userId']
+        for i in range(count):
+            org = Organization(name=f'Team {i}', description='An organization for developers')
+            db.session.add(org)
+            db.session.commit()
+            db.session.add(UserOrganization(user_id=user_id, organization_id=org.id))
+        db.session.commit()
+        return data['data']['accessToken']
+
+    def test_large_response_is_gzipped(self):
+        access_token = self.login_with_many_organizations(20)
+        response = self.client().get('/api/organisations', headers={
+            'Authorization': f'Bearer {access_token}',
+            'Accept-Encoding': 'gzip'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        data = json.loads(gzip.decompress(response.data))
+        self.assertEqual(len(data['data']['organisations']), 21)
+
+    def test_response_not_compressed_without_accept_encoding(self):
+        access_token = self.login_with_many_organizations(20)
+        response = self.client().get('/api/organisations', headers={'Authorization': f'Bearer {access_token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(response.json['data']['organisations']), 21)
+
+    def test_small_success_response_not_compressed(self):
+        response = self.client().get('/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(response.data), self.app.config['COMPRESS_MIN_SIZE'])
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_small_error_response_not_compressed(self):
+        response = self.client().post('/auth/login', data=json.dumps({}),
+                                      content_type='application/json', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_streamed_response_is_gzipped(self):
+        @self.app.route('/stream')
+        def stream():
+            return Response((json.dumps({'index': i}) + '\n' for i in range(100)), mimetype='application/json')
+
+        response = self.client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        lines = gzip.decompress(response.data).decode().splitlines()
+        self.assertEqual(len(lines), 100)
+
+    def test_tiny_stream_not_compressed(self):
+        @self.app.route('/tiny-stream')
+        def tiny_stream():
+            return Response((json.dumps({'index': i}) + '\n' for i in range(20)), mimetype='application/json')
+
+        response = self.client().get('/tiny-stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(response.data.decode().splitlines()), 20)
+
+    def test_streamed_source_is_closed(self):
+        closed = []
+
+        class Body:
+            def __iter__(self):
+                return iter([b'x' * 100] * 10)
+
+            def close(self):
+                closed.append(True)
+
+        @self.app.route('/closing-stream')
+        def closing_stream():
+            return Response(Body(), mimetype='application/json')
+
+        response = self.client().get('/closing-stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), b'x' * 1000)
+        response.close()
+        self.assertEqual(closed, [True])
+
+    def test_client_preference_for_gzip_is_honoured(self):
+        @self.app.route('/large')
+        def large():
+            return Response(b'x' * 1000, mimetype='application/json')
+
+        response = self.client().get('/large', headers={'Accept-Encoding': 'gzip;q=1, br;q=0.1'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), b'x' * 1000)
+
+    def test_wildcard_accept_encoding(self):
+        @self.app.route('/large')
+        def large():
+            return Response(b'x' * 1000, mimetype='application/json')
+
+        response = self.client().get('/large', headers={'Accept-Encoding': '*'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip' if brotli is None else 'br')
+
+    def test_invalid_compression_level_rejected(self):
+        with patch.object(TestingConfig, 'COMPRESS_LEVEL', 10):
+            with self.assertRaises(ValueError):
+                create_app('testing')
+
+    def test_list_body_without_content_length_is_gzipped(self):
+        @self.app.route('/chunks')
+        def chunks():
+            return Response([b'x' * 1000], mimetype='application/json')
+
+        response = self.client().get('/chunks', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), b'x' * 1000)
+
+    def test_partial_content_not_compressed(self):
+        @self.app.route('/partial')
+        def partial():
+            return Response(b'x' * 1000, status=206, mimetype='application/json',
+                            headers={'Content-Range': 'bytes 0-999/5000', 'Accept-Ranges': 'bytes'})
+
+        response = self.client().get('/partial', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, b'x' * 1000)
+
+    def test_compression_disabled(self):
+        with patch.object(TestingConfig, 'COMPRESS_ENABLED', False):
+            app = create_app('testing')
+        hooks = [func.__name__ for func in app.after_request_funcs.get(None, [])]
+        self.assertNotIn('compress_response', hooks)
+
+        @app.route('/large')
+        def large():
+            return Response(b'x' * 1000, mimetype='application/json')
+
+        response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, b'x' * 1000)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_large_response_is_brotli_compressed(self):
+        access_token = self.login_with_many_organizations(20)
+        response = self.client().get('/api/organisations', headers={
+            'Authorization': f'Bearer {access_token}',
+            'Accept-Encoding': 'br, gzip'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        data = json.loads(brotli.decompress(response.data))
+        self.assertEqual(len(data['data']['organisations']), 21)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_streamed_response_is_brotli_compressed(self):
+        @self.app.route('/stream')
+        def stream():
+            return Response((json.dumps({'index': i}) + '\n' for i in range(100)), mimetype='application/json')
+
+        response = self.client().get('/stream', headers={'Accept-Encoding': 'br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        lines = brotli.decompress(response.data).decode().splitlines()
+        self.assertEqual(len(lines), 100)
+
 if __name__ == '__main__':
     unittest.TextTestRunner(verbosity=2).run(unittest.TestLoader().loadTestsFromModule(sys.modules[__name__]))